@@ -2,14 +2,65 @@ import sqlite3
 import os
 import datetime
 import json
+import csv
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import requests
-import qrcode
-from PIL import Image, ImageTk
 import uuid
+import random
+import concurrent.futures
+import queue
+import threading
+import functools
+from contextlib import contextmanager
+from collections import OrderedDict
+from urllib.parse import urlencode, quote
+
+# matplotlib (with numpy), qrcode and PIL are slow to import, so they are loaded on first use
+Figure = None
+FigureCanvasTkAgg = None
+np = None
+qrcode = None
+Image = None
+ImageTk = None
+
+def load_matplotlib():
+    """Import matplotlib's Figure, its Tk backend and numpy on first use"""
+    # The Figure class is enough for an embedded canvas; pyplot would also pull in
+    # its global figure manager and backend selection
+    global Figure, FigureCanvasTkAgg, np
+    if Figure is None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        import numpy as np
+
+def load_qr_libraries():
+    """Import qrcode and PIL on first use"""
+    global qrcode, Image, ImageTk
+    if qrcode is None:
+        import qrcode
+        from PIL import Image, ImageTk
+
+# SQL for the interactive UPI paths, kept as constants so every call reuses
+# the same cached prepared statement
+_SQL_ADD_PENDING = "INSERT INTO upi_transactions (transaction_id, amount, description, status, date) VALUES (?, ?, ?, ?, ?)"
+_SQL_UPDATE_STATUS = "UPDATE upi_transactions SET status = ? WHERE transaction_id = ?"
+_SQL_GET_TRANSACTION = "SELECT * FROM upi_transactions WHERE transaction_id = ?"
+
+# UPI transaction statuses are stored as small integers
+_STATUS = {"pending": 0, "completed": 1, "failed": 2}
+_STATUS_NAMES = {code: name for name, code in _STATUS.items()}
+
+# Bulk expense inserts bind this many rows per statement (6 variables each,
+# well under SQLite's default limit of 999)
+_BULK_INSERT_ROWS = 100
+
+# How often the Tk thread collects finished background jobs while any are running
+_BACKGROUND_POLL_MS = 50
+
+# Outstanding UPI payments are polled every few seconds for up to five minutes
+_PAYMENT_POLL_MS = 3000
+_PAYMENT_POLL_ATTEMPTS = 100
 
 class UPIManager:
     """Manage UPI transactions and connections"""
@@ -22,16 +73,29 @@ class UPIManager:
         # In a production app, this would be stored securely
         self.api_key = "dummy_api_key" 
         
+        # One pooled HTTP session so gateway calls reuse kept-alive TLS connections
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {self.api_key}"
+        self.session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        
+        # QR versions already fitted per (amount, description)
+        self._qr_versions = {}
+        # Random source for the simulated gateway responses
+        self._rng = random.Random()
+        
     def generate_transaction_id(self):
         """Generate a unique transaction ID"""
-        return str(uuid.uuid4())
+        return uuid.uuid4().hex
     
-    def create_payment_request(self, amount, description):
-        """Create a UPI payment request and return a QR code"""
+    def create_payment_request(self, amount, description, target_size=300):
+        """Create a UPI payment request and return a target_size x target_size QR code"""
         try:
+            load_qr_libraries()
+            
             transaction_id = self.generate_transaction_id()
             
-            # In a real implementation, this would make an actual API call
+            # In a real implementation, this would make an actual API call, e.g.
+            # self.session.post(f"{self.api_url}/payments", json=payload, timeout=5)
             # Here we simulate the response
             upi_id = "expensetracker@upi"
             payload = {
@@ -43,17 +107,31 @@ class UPIManager:
                 "tn": description             # Transaction note
             }
             
-            # Create a UPI URI
-            upi_uri = "upi://pay?"
-            for key, value in payload.items():
-                upi_uri += f"{key}={value}&"
-            upi_uri = upi_uri[:-1]  # Remove the last '&'
+            # Create a UPI URI (percent-encoded, so '&' or spaces in the note are safe)
+            upi_uri = "upi://pay?" + urlencode(payload, safe="@", quote_via=quote)
             
-            # Generate QR code
-            qr = qrcode.QRCode(version=1, box_size=10, border=5)
-            qr.add_data(upi_uri)
-            qr.make(fit=True)
-            qr_img = qr.make_image(fill='black', back_color='white')
+            # Generate QR code. Transaction IDs have a fixed length, so the version
+            # fitted for an amount/description pair can be reused on later requests.
+            # The URI is added as a single byte-mode chunk (optimize=0); otherwise a run
+            # of digits in the ID would be packed into numeric mode and change the size
+            key = (amount, description)
+            version = self._qr_versions.get(key)
+            qr = qrcode.QRCode(version=version, box_size=10, border=5)
+            qr.add_data(upi_uri, optimize=0)
+            qr.make(fit=version is None)
+            if version is None:
+                if len(self._qr_versions) >= 64:
+                    self._qr_versions.pop(next(iter(self._qr_versions)))
+                self._qr_versions[key] = qr.version
+            
+            # Rasterise the module matrix (border included) in one pass and scale it
+            # straight to the display size, rather than having qrcode draw every module
+            # as a separate rectangle and resizing the result again
+            matrix = qr.get_matrix()
+            size = len(matrix)
+            pixels = bytes(0 if module else 255 for row in matrix for module in row)
+            qr_img = Image.frombytes("L", (size, size), pixels)
+            qr_img = qr_img.resize((target_size, target_size), Image.NEAREST)
             
             # Save transaction in database
             self.db_manager.add_pending_transaction(transaction_id, amount, description)
@@ -65,8 +143,8 @@ class UPIManager:
             print(f"Error creating payment request: {e}")
             return None, None
     
-    def check_transaction_status(self, transaction_id):
-        """Check the status of a transaction"""
+    def fetch_transaction_status(self, transaction_id):
+        """Ask the UPI gateway for a transaction's status (safe to call off the UI thread)"""
         # In a real app, this would make an API call to verify the payment status
         # For this example, we'll assume the payment is completed after verification
         
@@ -74,20 +152,31 @@ class UPIManager:
             # Simulate API request
             print(f"Checking status for transaction {transaction_id}")
             
-            # In a real app, you would get the actual status from the UPI gateway
+            # In a real app, you would get the actual status from the UPI gateway, e.g.
+            # self.session.get(f"{self.api_url}/payments/{transaction_id}", timeout=5)
             # For demo purposes, we'll randomly consider it successful
-            import random
-            status = "SUCCESS" if random.random() > 0.3 else "PENDING"
-            
-            if status == "SUCCESS":
-                # Update the transaction in the database
-                self.db_manager.update_transaction_status(transaction_id, "completed")
-                return True
-            return False
+            return "SUCCESS" if self._rng.random() > 0.3 else "PENDING"
             
         except Exception as e:
-            print(f"Error checking transaction status: {e}")
-            return False
+            print(f"Error fetching transaction status: {e}")
+            return None
+    
+    def poll_pending(self):
+        """Return the IDs of pending transactions the gateway reports as paid"""
+        # Status only: the caller settles each payment (status and expense) itself
+        return [
+            transaction_id
+            for transaction_id in self.db_manager.get_pending_transactions()
+            if self.fetch_transaction_status(transaction_id) == "SUCCESS"
+        ]
+
+def _synchronized(method):
+    """Run a DatabaseManager method while holding its connection lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 class DatabaseManager:
     """Manage SQLite database operations"""
@@ -96,17 +185,73 @@ class DatabaseManager:
         self.db_name = db_name
         self.conn = None
         self.cursor = None
+        # Today's date, cached for new transactions and rolled over by refresh_today()
+        self.today = datetime.date.today().isoformat()
+        # Nesting level of transaction() blocks; writes only commit at level 0
+        self._transaction_depth = 0
+        # The connection is shared with the app's I/O worker thread, so every use is serialised
+        self.lock = threading.RLock()
         self.connect()
         self.create_tables()
     
     def connect(self):
         """Connect to the SQLite database"""
         try:
-            self.conn = sqlite3.connect(self.db_name)
+            self.conn = sqlite3.connect(self.db_name, detect_types=0, cached_statements=256, check_same_thread=False)
+            # Plain tuples are the cheapest rows to build; the UI only indexes them
+            self.conn.row_factory = None
             self.cursor = self.conn.cursor()
+            
+            # WAL journaling makes each commit a log append instead of a full fsync
+            self.cursor.execute("PRAGMA journal_mode=WAL")
+            self.cursor.execute("PRAGMA synchronous=NORMAL")
+            self.cursor.execute("PRAGMA temp_store=MEMORY")
+            self.cursor.execute("PRAGMA cache_size=-20000")
+            self.cursor.execute("PRAGMA mmap_size=268435456")
         except sqlite3.Error as e:
             print(f"Database connection error: {e}")
     
+    @contextmanager
+    def transaction(self):
+        """Group several writes into a single commit; nested blocks become savepoints"""
+        # The lock is held for the whole block so other threads can't interleave statements
+        with self.lock:
+            savepoint = f"sp{self._transaction_depth}" if self._transaction_depth else None
+            if not savepoint and self.conn.in_transaction:
+                # Every write commits or rolls back its own implicit transaction, so one
+                # still open here means a write path is missing that step
+                raise sqlite3.ProgrammingError("transaction() started inside an uncommitted write")
+            self.conn.execute(f"SAVEPOINT {savepoint}" if savepoint else "BEGIN")
+            self._transaction_depth += 1
+            try:
+                yield
+            except BaseException:
+                self._transaction_depth -= 1
+                if savepoint:
+                    self.conn.execute(f"ROLLBACK TO {savepoint}")
+                    self.conn.execute(f"RELEASE {savepoint}")
+                else:
+                    self.conn.rollback()
+                raise
+            self._transaction_depth -= 1
+            if savepoint:
+                self.conn.execute(f"RELEASE {savepoint}")
+            else:
+                self.conn.commit()
+    
+    def _commit(self):
+        """Commit unless the write is part of an enclosing transaction() block"""
+        if not self._transaction_depth:
+            self.conn.commit()
+    
+    def _handle_write_error(self, action, error):
+        """Report and roll back a failed write, or fail the enclosing transaction() block"""
+        # Inside a block the whole block must roll back rather than commit a partial update
+        if self._transaction_depth:
+            raise error
+        print(f"Error {action}: {error}")
+        self.conn.rollback()
+    
     def create_tables(self):
         """Create necessary tables if they don't exist"""
         try:
@@ -139,11 +284,16 @@ class DatabaseManager:
                 transaction_id TEXT PRIMARY KEY,
                 amount REAL,
                 description TEXT,
-                status TEXT,
+                status INTEGER,
                 date TEXT
             )
             ''')
             
+            # Indexes for the date-range/category filters and status lookups
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date ON expenses (date DESC)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_expenses_cat_date ON expenses (category_id, date)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_upi_status ON upi_transactions (status, date)")
+            
             # Insert default categories if they don't exist
             default_categories = [
                 ("Food", 5000),
@@ -156,16 +306,23 @@ class DatabaseManager:
                 ("Others", 1000)
             ]
             
-            for category, budget in default_categories:
-                self.cursor.execute(
+            # Seed all defaults in one statement and one transaction
+            with self.transaction():
+                self.cursor.executemany(
                     "INSERT OR IGNORE INTO categories (name, budget) VALUES (?, ?)",
-                    (category, budget)
+                    default_categories
+                )
+                
+                # Convert statuses written as text by older versions to their integer codes
+                self.cursor.execute(
+                    "UPDATE upi_transactions SET status = CASE status WHEN 'pending' THEN ? WHEN 'completed' THEN ? ELSE ? END "
+                    "WHERE status IN ('pending', 'completed', 'failed')",
+                    (_STATUS["pending"], _STATUS["completed"], _STATUS["failed"])
                 )
-            
-            self.conn.commit()
         except sqlite3.Error as e:
             print(f"Error creating tables: {e}")
     
+    @_synchronized
     def get_categories(self):
         """Get all expense categories"""
         try:
@@ -175,6 +332,7 @@ class DatabaseManager:
             print(f"Error fetching categories: {e}")
             return []
     
+    @_synchronized
     def add_category(self, name, budget=0):
         """Add a new expense category"""
         try:
@@ -182,12 +340,13 @@ class DatabaseManager:
                 "INSERT INTO categories (name, budget) VALUES (?, ?)",
                 (name, budget)
             )
-            self.conn.commit()
+            self._commit()
             return True
         except sqlite3.Error as e:
-            print(f"Error adding category: {e}")
+            self._handle_write_error("adding category", e)
             return False
     
+    @_synchronized
     def update_category_budget(self, category_id, budget):
         """Update the budget for a category"""
         try:
@@ -195,12 +354,13 @@ class DatabaseManager:
                 "UPDATE categories SET budget = ? WHERE id = ?",
                 (budget, category_id)
             )
-            self.conn.commit()
+            self._commit()
             return True
         except sqlite3.Error as e:
-            print(f"Error updating category budget: {e}")
+            self._handle_write_error("updating category budget", e)
             return False
     
+    @_synchronized
     def add_expense(self, amount, description, category_id, date, payment_method, transaction_id=None):
         """Add a new expense"""
         try:
@@ -208,67 +368,86 @@ class DatabaseManager:
                 "INSERT INTO expenses (amount, description, category_id, date, payment_method, transaction_id) VALUES (?, ?, ?, ?, ?, ?)",
                 (amount, description, category_id, date, payment_method, transaction_id)
             )
-            self.conn.commit()
+            self._commit()
             return True
         except sqlite3.Error as e:
-            print(f"Error adding expense: {e}")
+            self._handle_write_error("adding expense", e)
             return False
     
-    def get_expenses(self, start_date=None, end_date=None, category_id=None):
-        """Get expenses with optional filtering"""
+    @_synchronized
+    def add_expenses_bulk(self, rows):
+        """Add many expenses at once from (amount, description, category_id, date, payment_method, transaction_id) rows"""
+        try:
+            rows = list(rows)
+            
+            # One multi-row INSERT per chunk beats executemany's one statement step per row
+            with self.transaction():
+                for start in range(0, len(rows), _BULK_INSERT_ROWS):
+                    chunk = rows[start:start + _BULK_INSERT_ROWS]
+                    placeholders = ", ".join(["(?, ?, ?, ?, ?, ?)"] * len(chunk))
+                    self.cursor.execute(
+                        "INSERT INTO expenses (amount, description, category_id, date, payment_method, transaction_id) VALUES " + placeholders,
+                        [value for row in chunk for value in row]
+                    )
+            return True
+        except sqlite3.Error as e:
+            self._handle_write_error("adding expenses", e)
+            return False
+    
+    def iter_expenses(self, start_date=None, end_date=None, category_id=None):
+        """Yield expenses with optional filtering, streaming rows from the cursor"""
         try:
             query = "SELECT e.id, e.amount, e.description, c.name, e.date, e.payment_method FROM expenses e JOIN categories c ON e.category_id = c.id"
+            conditions = []
             params = []
             
-            if start_date or end_date or category_id:
-                query += " WHERE"
-                
-                if start_date:
-                    query += " e.date >= ?"
-                    params.append(start_date)
-                    if end_date or category_id:
-                        query += " AND"
-                
-                if end_date:
-                    query += " e.date <= ?"
-                    params.append(end_date)
-                    if category_id:
-                        query += " AND"
-                
-                if category_id:
-                    query += " e.category_id = ?"
-                    params.append(category_id)
+            if start_date:
+                conditions.append("e.date >= ?")
+                params.append(start_date)
+            
+            if end_date:
+                conditions.append("e.date <= ?")
+                params.append(end_date)
+            
+            if category_id:
+                conditions.append("e.category_id = ?")
+                params.append(category_id)
+            
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
             
             query += " ORDER BY e.date DESC"
             
-            self.cursor.execute(query, params)
-            return self.cursor.fetchall()
+            # Use a dedicated cursor so other queries can't reset the stream mid-iteration,
+            # and hold the lock until the stream is exhausted
+            with self.lock:
+                yield from self.conn.execute(query, params)
         except sqlite3.Error as e:
             print(f"Error fetching expenses: {e}")
-            return []
     
+    @_synchronized
     def get_category_totals(self, start_date=None, end_date=None):
-        """Get total expenses by category for a date range"""
+        """Get total spent, budget and remaining amount by category for a date range"""
         try:
             query = """
-            SELECT c.name, COALESCE(SUM(e.amount), 0) as total, c.budget 
+            SELECT c.name, COALESCE(SUM(e.amount), 0) as total, COALESCE(c.budget, 0) as budget,
+                   COALESCE(c.budget, 0) - COALESCE(SUM(e.amount), 0) as remaining
             FROM categories c
             LEFT JOIN expenses e ON c.id = e.category_id
             """
+            conditions = []
             params = []
             
-            if start_date or end_date:
-                query += " WHERE"
-                
-                if start_date:
-                    query += " e.date >= ?"
-                    params.append(start_date)
-                    if end_date:
-                        query += " AND"
-                
-                if end_date:
-                    query += " e.date <= ?"
-                    params.append(end_date)
+            if start_date:
+                conditions.append("e.date >= ?")
+                params.append(start_date)
+            
+            if end_date:
+                conditions.append("e.date <= ?")
+                params.append(end_date)
+            
+            if conditions:
+                query += " WHERE " + " AND ".join(conditions)
             
             query += " GROUP BY c.id ORDER BY total DESC"
             
@@ -278,60 +457,126 @@ class DatabaseManager:
             print(f"Error fetching category totals: {e}")
             return []
     
+    @_synchronized
     def delete_expense(self, expense_id):
         """Delete an expense by ID"""
         try:
             self.cursor.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
-            self.conn.commit()
+            self._commit()
             return True
         except sqlite3.Error as e:
-            print(f"Error deleting expense: {e}")
+            self._handle_write_error("deleting expense", e)
             return False
     
+    def refresh_today(self):
+        """Refresh the cached date used for new transactions"""
+        self.today = datetime.date.today().isoformat()
+    
+    @_synchronized
     def add_pending_transaction(self, transaction_id, amount, description):
         """Add a pending UPI transaction"""
         try:
-            current_date = datetime.datetime.now().strftime("%Y-%m-%d")
             self.cursor.execute(
-                "INSERT INTO upi_transactions (transaction_id, amount, description, status, date) VALUES (?, ?, ?, ?, ?)",
-                (transaction_id, amount, description, "pending", current_date)
+                _SQL_ADD_PENDING,
+                (transaction_id, amount, description, _STATUS["pending"], self.today)
             )
-            self.conn.commit()
+            self._commit()
             return True
         except sqlite3.Error as e:
-            print(f"Error adding pending transaction: {e}")
+            self._handle_write_error("adding pending transaction", e)
             return False
     
+    @_synchronized
     def update_transaction_status(self, transaction_id, status):
         """Update the status of a UPI transaction"""
         try:
             self.cursor.execute(
-                "UPDATE upi_transactions SET status = ? WHERE transaction_id = ?",
-                (status, transaction_id)
+                _SQL_UPDATE_STATUS,
+                (_STATUS[status], transaction_id)
             )
-            self.conn.commit()
+            self._commit()
             return True
         except sqlite3.Error as e:
-            print(f"Error updating transaction status: {e}")
+            self._handle_write_error("updating transaction status", e)
             return False
     
+    @_synchronized
+    def update_transaction_status_many(self, transaction_ids, status):
+        """Update the status of several UPI transactions in one statement"""
+        try:
+            transaction_ids = list(transaction_ids)
+            placeholders = ", ".join("?" * len(transaction_ids))
+            self.cursor.execute(
+                f"UPDATE upi_transactions SET status = ? WHERE transaction_id IN ({placeholders})",
+                [_STATUS[status]] + transaction_ids
+            )
+            self._commit()
+            return True
+        except sqlite3.Error as e:
+            self._handle_write_error("updating transaction statuses", e)
+            return False
+    
+    @_synchronized
+    def get_pending_transactions(self):
+        """Get the IDs of all pending UPI transactions"""
+        try:
+            self.cursor.execute(
+                "SELECT transaction_id FROM upi_transactions WHERE status = ?",
+                (_STATUS["pending"],)
+            )
+            return [row[0] for row in self.cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error fetching pending transactions: {e}")
+            return []
+    
+    @_synchronized
     def get_transaction_details(self, transaction_id):
         """Get details of a specific transaction"""
         try:
             self.cursor.execute(
-                "SELECT * FROM upi_transactions WHERE transaction_id = ?",
+                _SQL_GET_TRANSACTION,
                 (transaction_id,)
             )
-            return self.cursor.fetchone()
+            transaction = self.cursor.fetchone()
+            
+            # Report the status by name rather than its stored code
+            if transaction:
+                transaction = transaction[:3] + (_STATUS_NAMES[int(transaction[3])],) + transaction[4:]
+            return transaction
         except sqlite3.Error as e:
             print(f"Error fetching transaction details: {e}")
             return None
     
+    @_synchronized
     def close(self):
         """Close the database connection"""
         if self.conn:
+            # Let SQLite refresh the planner statistics the indexes rely on
+            try:
+                self.conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                print(f"Error optimizing database: {e}")
             self.conn.close()
 
+def _format_balance(amount):
+    """Format an amount to two decimals, showing a deficit in parentheses"""
+    return f"{amount:.2f}" if amount >= 0 else f"({-amount:.2f})"
+
+def _clear_tree(tree):
+    """Delete every row of a treeview in a single Tk call"""
+    children = tree.get_children()
+    if children:
+        tree.delete(*children)
+
+def _bulk_fill_tree(tree, rows):
+    """Replace a treeview's contents with pre-formatted rows"""
+    _clear_tree(tree)
+    
+    # Bind the method once; the loop then only makes the unavoidable Tk calls
+    insert = tree.insert
+    for row in rows:
+        insert("", "end", values=row)
+
 class ExpenseTrackerApp:
     """Main application class for the expense tracker"""
     
@@ -343,10 +588,40 @@ class ExpenseTrackerApp:
         
         # Initialize database manager
         self.db_manager = DatabaseManager()
+        self.schedule_date_refresh()
         
         # Initialize UPI manager
         self.upi_manager = UPIManager(self.db_manager)
         
+        # Single worker for database writes so the Tk main loop stays responsive; one
+        # worker keeps the writes in submission order
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        # Gateway calls get their own workers, so a slow status check never holds up a write
+        self._gateway_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        
+        # Finished jobs are queued by the worker and collected on the Tk thread, so the
+        # worker never touches Tk itself
+        self._finished_jobs = queue.Queue()
+        self._running_jobs = 0
+        self._collect_after_id = None
+        
+        # Categories cached from the database; reloaded by load_categories()
+        self._categories_cache = None
+        self._category_id_map = {}
+        
+        # Names last written to the category comboboxes
+        self._last_category_names = None
+        
+        # Recent category totals keyed by (start_date, end_date); cleared on every write
+        self._agg_cache = OrderedDict()
+        
+        # Bumped on every write so update_dashboard can skip re-rendering unchanged data
+        self._data_version = 0
+        self._last_dashboard_key = None
+        
+        # Pending debounced expenses reload, if any
+        self._load_expenses_after_id = None
+        
         # Set up the UI
         self.setup_ui()
         
@@ -355,6 +630,53 @@ class ExpenseTrackerApp:
         self.load_categories()
         self.update_dashboard()
     
+    def run_in_background(self, work, on_done, pool=None, on_error=None):
+        """Run work() on a worker (the database one by default) and pass its result to on_done on the Tk thread"""
+        future = (pool or self._io_pool).submit(work)
+        future.add_done_callback(lambda f: self._finished_jobs.put((f, on_done, on_error)))
+        self._running_jobs += 1
+        if self._collect_after_id is None:
+            self._collect_after_id = self.root.after(_BACKGROUND_POLL_MS, self.collect_background_jobs)
+    
+    def collect_background_jobs(self):
+        """Hand finished background jobs to their callbacks, reporting any that failed"""
+        self._collect_after_id = None
+        
+        try:
+            while True:
+                try:
+                    future, on_done, on_error = self._finished_jobs.get_nowait()
+                except queue.Empty:
+                    break
+                
+                self._running_jobs -= 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if on_error:
+                        on_error(e)
+                    else:
+                        messagebox.showerror("Error", f"An error occurred: {str(e)}")
+                    continue
+                on_done(result)
+        finally:
+            # Keep collecting while jobs are outstanding, even if a callback raised; one
+            # may also have started new jobs (and the collector) while a dialog was open
+            if self._running_jobs and self._collect_after_id is None:
+                self._collect_after_id = self.root.after(_BACKGROUND_POLL_MS, self.collect_background_jobs)
+    
+    def schedule_date_refresh(self):
+        """Roll the database's cached date over shortly after the next midnight"""
+        now = datetime.datetime.now()
+        next_midnight = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time.min)
+        delay_ms = int((next_midnight - now).total_seconds() * 1000) + 1000
+        self.root.after(delay_ms, self.on_new_day)
+    
+    def on_new_day(self):
+        """Refresh the cached date and schedule the next rollover"""
+        self.db_manager.refresh_today()
+        self.schedule_date_refresh()
+    
     def setup_ui(self):
         """Set up the user interface"""
         # Create notebook (tabs)
@@ -423,15 +745,38 @@ class ExpenseTrackerApp:
         self.summary_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Right side - Charts
-        charts_frame = ttk.LabelFrame(dashboard_content, text="Expense Analysis")
-        charts_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.charts_frame = ttk.LabelFrame(dashboard_content, text="Expense Analysis")
+        self.charts_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        # The figure is built once the window is idle (see update_charts), so startup
+        # doesn't wait on the matplotlib import
+        self.fig = None
+        self._pending_totals = None
+    
+    def build_charts(self):
+        """Create the matplotlib figure and draw the totals queued before it existed"""
         # Create a Figure for plots
-        self.fig = plt.Figure(figsize=(6, 8), dpi=100)
+        load_matplotlib()
+        self.fig = Figure(figsize=(6, 8), dpi=100)
         
         # Create canvas for figure
-        self.canvas = FigureCanvasTkAgg(self.fig, master=charts_frame)
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.charts_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        
+        # Axes are created once and cleared or updated in place on refresh
+        self.ax1 = self.fig.add_subplot(211)  # Pie chart
+        self.ax2 = self.fig.add_subplot(212)  # Bar chart
+        
+        # Bar positions, rebuilt only when the number of categories changes
+        self._bar_x = np.arange(0)
+        
+        # Bar containers and the categories they were drawn for
+        self._budget_bars = None
+        self._spent_bars = None
+        self._bar_categories = None
+        
+        self.update_charts(self._pending_totals)
+        self._pending_totals = None
     
     def setup_expenses_tab(self):
         """Set up the expenses tab"""
@@ -641,6 +986,9 @@ class ExpenseTrackerApp:
         self.qr_label = tk.Label(self.qr_frame, text="Generate a QR code to make a payment")
         self.qr_label.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         
+        # Tk image shown in qr_label, created on the first QR and reused afterwards
+        self.qr_photo = None
+        
         # Transaction status
         status_frame = ttk.Frame(payment_frame)
         status_frame.pack(fill=tk.X, padx=10, pady=10)
@@ -678,8 +1026,9 @@ class ExpenseTrackerApp:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.transactions_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        # Current transaction ID
+        # Current transaction ID, and the one whose settlement is being recorded
         self.current_transaction_id = None
+        self._settling_transaction_id = None
         
     def generate_upi_qr(self):
         """Generate a UPI QR code for payment"""
@@ -701,19 +1050,25 @@ class ExpenseTrackerApp:
                 # Save the current transaction ID
                 self.current_transaction_id = transaction_id
                 
-                # Convert PIL image to Tkinter PhotoImage
-                qr_img = qr_img.resize((300, 300))  # Resize to fit
-                self.qr_photo = ImageTk.PhotoImage(qr_img)
+                # Convert PIL image to Tkinter PhotoImage, pasting into the existing
+                # one rather than allocating a new Tk image for every payment
+                if self.qr_photo is None:
+                    self.qr_photo = ImageTk.PhotoImage(qr_img)
+                else:
+                    self.qr_photo.paste(qr_img)
                 
                 # Update QR display
                 self.qr_label.config(image=self.qr_photo)
-                self.qr_label.image = self.qr_photo  # Keep a reference
                 
                 # Update status label
                 self.status_label.config(text="Transaction pending")
                 
                 # Show success message
                 messagebox.showinfo("QR Code Generated", "Scan the QR code with any UPI app to make payment.")
+                
+                # Watch for the payment in the background once the dialog is closed, so its
+                # result can't pop up over it; the button stays as a manual check
+                self.schedule_payment_poll(transaction_id, _PAYMENT_POLL_ATTEMPTS)
             else:
                 messagebox.showerror("Error", "Failed to generate UPI QR code.")
         
@@ -728,117 +1083,206 @@ class ExpenseTrackerApp:
             messagebox.showinfo("No Transaction", "No active transaction to check.")
             return
         
-        # Check status with UPI manager
-        success = self.upi_manager.check_transaction_status(self.current_transaction_id)
+        if self.current_transaction_id == self._settling_transaction_id:
+            messagebox.showinfo("Payment Status", "This payment is already being recorded.")
+            return
         
-        if success:
+        # Query the gateway on a worker thread; the result is handled back on the Tk thread
+        transaction_id = self.current_transaction_id
+        self.status_label.config(text="Checking payment status...")
+        self.run_in_background(
+            lambda: self.upi_manager.fetch_transaction_status(transaction_id),
+            lambda status: self.on_payment_status(transaction_id, status),
+            self._gateway_pool
+        )
+    
+    def schedule_payment_poll(self, transaction_id, attempts_left):
+        """Check the gateway again shortly while the payment is outstanding"""
+        self.root.after(_PAYMENT_POLL_MS, self._poll_payment, transaction_id, attempts_left)
+    
+    def _poll_payment(self, transaction_id, attempts_left):
+        """Query the gateway on a worker thread for an outstanding payment"""
+        # Stop once the payment is being settled or has been replaced by a new QR code
+        if transaction_id != self.current_transaction_id or transaction_id == self._settling_transaction_id:
+            return
+        
+        self.run_in_background(
+            lambda: self.upi_manager.fetch_transaction_status(transaction_id),
+            lambda status: self._on_poll_result(transaction_id, status, attempts_left - 1),
+            self._gateway_pool
+        )
+    
+    def _on_poll_result(self, transaction_id, status, attempts_left):
+        """Settle a polled payment, or poll again quietly while it is still pending"""
+        if status == "SUCCESS":
+            self.on_payment_status(transaction_id, status)
+        elif attempts_left > 0 and transaction_id == self.current_transaction_id:
+            self.schedule_payment_poll(transaction_id, attempts_left)
+    
+    def on_payment_status(self, transaction_id, status):
+        """Handle a gateway status result for a UPI transaction"""
+        # Ignore stale results for a transaction that has been replaced or is already
+        # being settled (a poll or manual check can complete while the dialogs are open)
+        if transaction_id != self.current_transaction_id or transaction_id == self._settling_transaction_id:
+            return
+        
+        if status == "SUCCESS":
+            self._settling_transaction_id = transaction_id
+            
             self.status_label.config(text="Payment successful")
             messagebox.showinfo("Payment Status", "Payment completed successfully!")
             
-            # Add as expense if successful
-            transaction = self.db_manager.get_transaction_details(self.current_transaction_id)
+            # Add as expense if successful; rows are gathered so several settled
+            # payments could be recorded with one bulk insert
+            expense_rows = []
+            transaction = self.db_manager.get_transaction_details(transaction_id)
             if transaction:
-                # Ask which category to assign
-                categories = self.db_manager.get_categories()
-                category_names = [cat[1] for cat in categories]
-                category_id_map = {cat[1]: cat[0] for cat in categories}
+                # Ask which category to assign; the cached map is keyed by name in table order
+                self._get_categories_cached()
+                category_id_map = self._category_id_map
                 
                 category = simpledialog.askstring(
                     "Select Category", 
                     "Select a category for this expense:",
-                    initialvalue=category_names[0] if category_names else ""
+                    initialvalue=next(iter(category_id_map), "")
                 )
                 
                 if category and category in category_id_map:
-                    # Add expense record
-                    self.db_manager.add_expense(
+                    expense_rows.append((
                         transaction[1],  # amount
                         transaction[2],  # description
                         category_id_map[category],  # category_id
                         transaction[4],  # date
                         "UPI",  # payment_method
                         transaction[0]   # transaction_id
-                    )
+                    ))
+            
+            def record_payment():
+                # Mark the payment completed and record its expenses with a single commit
+                with self.db_manager.transaction():
+                    self.db_manager.update_transaction_status(transaction_id, "completed")
                     
-                    # Refresh expenses
-                    self.load_expenses()
-                    self.update_dashboard()
+                    if expense_rows:
+                        self.db_manager.add_expenses_bulk(expense_rows)
+                return bool(expense_rows)
             
-            # Reset current transaction
-            self.current_transaction_id = None
-            self.qr_label.config(image="")
-            self.qr_label.config(text="Generate a QR code to make a payment")
+            self.run_in_background(
+                record_payment,
+                lambda expense_added: self.on_payment_recorded(transaction_id, expense_added),
+                on_error=lambda error: self.on_payment_record_failed(transaction_id, error)
+            )
         else:
             self.status_label.config(text="Payment pending")
             messagebox.showinfo("Payment Status", "Payment is still pending. Try checking again after a few moments.")
     
+    def on_payment_recorded(self, transaction_id, expense_added):
+        """Reset the UPI tab and refresh the views once a settled payment has been written"""
+        if transaction_id == self._settling_transaction_id:
+            self._settling_transaction_id = None
+        
+        # Reset current transaction, unless a new QR code has replaced it meanwhile
+        if transaction_id == self.current_transaction_id:
+            self.current_transaction_id = None
+            self.qr_label.config(image="")
+            self.qr_label.config(text="Generate a QR code to make a payment")
+        
+        if expense_added:
+            # Refresh expenses
+            self._data_changed()
+            self.schedule_load_expenses()
+            self.update_dashboard()
+    
+    def on_payment_record_failed(self, transaction_id, error):
+        """Keep a paid transaction current so recording it can be retried"""
+        if transaction_id == self._settling_transaction_id:
+            self._settling_transaction_id = None
+        if transaction_id == self.current_transaction_id:
+            self.status_label.config(text="Payment not recorded")
+        messagebox.showerror(
+            "Error",
+            f"The payment was received but could not be recorded: {str(error)}\n"
+            "Check the payment status again to retry."
+        )
+    
+    def _data_changed(self):
+        """Invalidate cached aggregates after a database write"""
+        self._agg_cache.clear()
+        self._data_version += 1
+    
     def update_dashboard(self):
         """Update the dashboard data and charts"""
         # Get date range from dashboard filters
         start_date = self.start_date_var.get()
         end_date = self.end_date_var.get()
         
-        # Get category totals
-        category_totals = self.db_manager.get_category_totals(start_date, end_date)
-        
-        # Update summary treeview
-        for item in self.summary_tree.get_children():
-            self.summary_tree.delete(item)
-        
-        total_spent = 0
-        total_budget = 0
-        
-        for category, spent, budget in category_totals:
-            spent = float(spent) if spent else 0
-            budget = float(budget) if budget else 0
-            remaining = budget - spent
-            remaining_str = f"{remaining:.2f}" if remaining >= 0 else f"({abs(remaining):.2f})"
-            
-            self.summary_tree.insert("", "end", values=(
-                category,
-                f"{spent:.2f}",
-                f"{budget:.2f}",
-                remaining_str
-            ))
-            
-            total_spent += spent
-            total_budget += budget
+        # Nothing to redraw if neither the data nor the range changed since the last render
+        render_key = (self._data_version, start_date, end_date)
+        if render_key == self._last_dashboard_key:
+            return
+        self._last_dashboard_key = render_key
+        
+        # Get category totals, reusing the cached aggregate for this date range
+        key = (start_date, end_date)
+        category_totals = self._agg_cache.get(key)
+        if category_totals is None:
+            category_totals = self.db_manager.get_category_totals(start_date, end_date)
+            self._agg_cache[key] = category_totals
+            if len(self._agg_cache) > 8:
+                self._agg_cache.popitem(last=False)
+        
+        # Format the summary rows, then fill the treeview in one pass
+        summary_rows = [
+            (category, f"{spent:.2f}", f"{budget:.2f}", _format_balance(remaining))
+            for category, spent, budget, remaining in category_totals
+        ]
         
         # Add total row
-        total_remaining = total_budget - total_spent
-        total_remaining_str = f"{total_remaining:.2f}" if total_remaining >= 0 else f"({abs(total_remaining):.2f})"
+        total_spent = sum(row[1] for row in category_totals)
+        total_budget = sum(row[2] for row in category_totals)
         
-        self.summary_tree.insert("", "end", values=(
+        summary_rows.append((
             "TOTAL",
             f"{total_spent:.2f}",
             f"{total_budget:.2f}",
-            total_remaining_str
+            _format_balance(total_budget - total_spent)
         ))
         
+        _bulk_fill_tree(self.summary_tree, summary_rows)
+        
         # Update charts
         self.update_charts(category_totals)
     
     def update_charts(self, category_totals):
         """Update the charts in the dashboard"""
-        # Clear previous charts
-        self.fig.clear()
+        # Until the figure exists, keep only the latest totals and build it when idle
+        if self.fig is None:
+            if self._pending_totals is None:
+                self.root.after_idle(self.build_charts)
+            self._pending_totals = category_totals
+            return
+        
+        ax1 = self.ax1
+        ax2 = self.ax2
         
         # Skip if no data
         if not category_totals:
-            self.canvas.draw()
+            for ax in (ax1, ax2):
+                ax.cla()
+                ax.axis('off')
+            self._bar_categories = None
+            self.canvas.draw_idle()
             return
         
-        # Extract data
-        categories = [cat[0] for cat in category_totals]
-        spent = [float(cat[1]) if cat[1] else 0 for cat in category_totals]
-        budgets = [float(cat[2]) if cat[2] else 0 for cat in category_totals]
-        
-        # Create subplots
-        ax1 = self.fig.add_subplot(211)  # Pie chart
-        ax2 = self.fig.add_subplot(212)  # Bar chart
+        # Extract columns as float arrays (any NULL becomes 0)
+        columns = list(zip(*category_totals))
+        categories = columns[0]
+        spent = np.nan_to_num(np.array(columns[1], dtype=np.float64))
+        budgets = np.nan_to_num(np.array(columns[2], dtype=np.float64))
         
-        # Pie chart - Expense distribution
-        if sum(spent) > 0:  # Only create chart if there are expenses
+        # Pie chart - Expense distribution (wedges depend on every value, so always redrawn)
+        ax1.cla()
+        ax1.axis('on')
+        if spent.sum() > 0:  # Only create chart if there are expenses
             ax1.pie(
                 spent, 
                 labels=categories, 
@@ -851,23 +1295,41 @@ class ExpenseTrackerApp:
             ax1.axis('off')
         
         # Bar chart - Budget vs Actual
-        x = range(len(categories))
-        width = 0.35
-        
-        ax2.bar(x, budgets, width, label='Budget')
-        ax2.bar([i + width for i in x], spent, width, label='Spent')
-        
-        ax2.set_title('Budget vs Actual Spending')
-        ax2.set_xticks([i + width/2 for i in x])
-        ax2.set_xticklabels(categories, rotation=45, ha='right')
-        ax2.legend()
+        if categories == self._bar_categories:
+            # Same categories in the same order: only the bar heights change
+            for rect, height in zip(self._budget_bars, budgets):
+                rect.set_height(height)
+            for rect, height in zip(self._spent_bars, spent):
+                rect.set_height(height)
+            ax2.relim()
+            ax2.autoscale_view()
+        else:
+            ax2.cla()
+            ax2.axis('on')
+            
+            if len(self._bar_x) != len(categories):
+                self._bar_x = np.arange(len(categories))
+            x = self._bar_x
+            width = 0.35
+            
+            # Axis-aligned bars look the same without anti-aliasing and rasterise faster
+            self._budget_bars = ax2.bar(x, budgets, width, label='Budget', antialiased=False)
+            self._spent_bars = ax2.bar(x + width, spent, width, label='Spent', antialiased=False)
+            self._bar_categories = categories
+            
+            ax2.set_title('Budget vs Actual Spending')
+            ax2.set_xticks(x + width/2)
+            ax2.set_xticklabels(categories, rotation=45, ha='right')
+            ax2.legend()
+            
+            # Tick labels changed, so the layout needs recomputing
+            self.fig.tight_layout()
         
-        # Adjust layout and draw
-        self.fig.tight_layout()
-        self.canvas.draw()
+        # Schedule a single redraw once Tk is idle
+        self.canvas.draw_idle()
     
-    def load_expenses(self):
-        """Load expenses data based on filters"""
+    def get_expense_filters(self):
+        """Return (start_date, end_date, category_id) from the expenses tab filters"""
         # Get filter values
         start_date = self.expense_start_date_var.get() if self.expense_start_date_var.get() else None
         end_date = self.expense_end_date_var.get() if self.expense_end_date_var.get() else None
@@ -875,54 +1337,71 @@ class ExpenseTrackerApp:
         # Get selected category ID
         category_id = None
         if self.expense_category_var.get():
-            categories = self.db_manager.get_categories()
-            category_id_map = {cat[1]: cat[0] for cat in categories}
-            if self.expense_category_var.get() in category_id_map:
-                category_id = category_id_map[self.expense_category_var.get()]
-        
-        # Clear existing data
-        for item in self.expenses_tree.get_children():
-            self.expenses_tree.delete(item)
-        
-        # Fetch expenses
-        expenses = self.db_manager.get_expenses(start_date, end_date, category_id)
-        
-        # Populate treeview
-        for expense in expenses:
-            self.expenses_tree.insert("", "end", values=(
-                expense[0],  # ID
-                expense[4],  # Date
-                expense[3],  # Category name
-                expense[2],  # Description
-                f"{expense[1]:.2f}",  # Amount
-                expense[5]   # Payment method
-            ))
+            self._get_categories_cached()
+            if self.expense_category_var.get() in self._category_id_map:
+                category_id = self._category_id_map[self.expense_category_var.get()]
+        
+        return start_date, end_date, category_id
+    
+    def load_expenses(self):
+        """Load expenses data based on filters"""
+        start_date, end_date, category_id = self.get_expense_filters()
+        
+        # Format the streamed rows up front so the fill loop only talks to Tk; unpacking
+        # each row once is cheaper than indexing it for every column
+        rows = [
+            (expense_id, date, category_name, description, f"{amount:.2f}", payment_method)
+            for expense_id, amount, description, category_name, date, payment_method
+            in self.db_manager.iter_expenses(start_date, end_date, category_id)
+        ]
+        _bulk_fill_tree(self.expenses_tree, rows)
+    
+    def _get_categories_cached(self):
+        """Return the categories, querying the database only when the cache is empty"""
+        if self._categories_cache is None:
+            self._categories_cache = self.db_manager.get_categories()
+            self._category_id_map = {cat[1]: cat[0] for cat in self._categories_cache}
+        return self._categories_cache
     
     def load_categories(self):
         """Load categories data"""
-        # Load categories for dropdown in add expense tab
-        categories = self.db_manager.get_categories()
-        category_names = [cat[1] for cat in categories]
+        # Categories may have changed, so reload them into the cache
+        self._categories_cache = None
         
-        self.category_combo['values'] = category_names
-        if category_names:
-            self.category_combo.current(0)
+        # Load categories for dropdown in add expense tab
+        categories = self._get_categories_cached()
+        category_names = tuple(cat[1] for cat in categories)
         
-        # Load categories for filter in expenses tab
-        self.expense_category_combo['values'] = [""] + category_names
+        # Budget-only changes leave the names alone, so skip rebuilding the dropdowns
+        if category_names != self._last_category_names:
+            self._last_category_names = category_names
+            
+            self.category_combo['values'] = category_names
+            if category_names:
+                self.category_combo.current(0)
+            
+            # Load categories for filter in expenses tab
+            self.expense_category_combo['values'] = ("",) + category_names
         
         # Update budget management tab
-        for item in self.budget_tree.get_children():
-            self.budget_tree.delete(item)
-            
-        for category in categories:
-            self.budget_tree.insert("", "end", values=(category[0], category[1], f"{category[2]:.2f}"))
+        _bulk_fill_tree(self.budget_tree, [(cat[0], cat[1], f"{cat[2]:.2f}") for cat in categories])
     
     def clear_expense_filters(self):
         """Clear filters in expenses tab"""
         self.expense_start_date_var.set("")
         self.expense_end_date_var.set("")
         self.expense_category_var.set("")
+        self.schedule_load_expenses()
+    
+    def schedule_load_expenses(self):
+        """Reload the expenses list shortly, coalescing a burst of requests into one query"""
+        if self._load_expenses_after_id is not None:
+            self.root.after_cancel(self._load_expenses_after_id)
+        self._load_expenses_after_id = self.root.after(50, self._run_scheduled_load)
+    
+    def _run_scheduled_load(self):
+        """Run the debounced expenses reload"""
+        self._load_expenses_after_id = None
         self.load_expenses()
     
     def add_expense(self):
@@ -944,37 +1423,42 @@ class ExpenseTrackerApp:
             
             # Get category ID
             category_name = self.category_var.get()
-            categories = self.db_manager.get_categories()
-            category_id_map = {cat[1]: cat[0] for cat in categories}
+            self._get_categories_cached()
             
-            if category_name not in category_id_map:
+            if category_name not in self._category_id_map:
                 messagebox.showerror("Invalid Category", "Please select a valid category.")
                 return
             
-            category_id = category_id_map[category_name]
+            category_id = self._category_id_map[category_name]
             
-            # Add expense to database
-            success = self.db_manager.add_expense(
-                amount,
-                description,
-                category_id,
-                date,
-                payment_method
+            # Add expense to database on the I/O worker
+            self.run_in_background(
+                lambda: self.db_manager.add_expense(
+                    amount,
+                    description,
+                    category_id,
+                    date,
+                    payment_method
+                ),
+                self.on_expense_added
             )
-            
-            if success:
-                messagebox.showinfo("Success", "Expense added successfully.")
-                self.clear_form()
-                self.load_expenses()
-                self.update_dashboard()
-            else:
-                messagebox.showerror("Error", "Failed to add expense.")
                 
         except ValueError:
             messagebox.showerror("Invalid Input", "Please enter a valid amount.")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
+    def on_expense_added(self, success):
+        """Report the result of adding an expense and refresh the views"""
+        if success:
+            messagebox.showinfo("Success", "Expense added successfully.")
+            self._data_changed()
+            self.clear_form()
+            self.schedule_load_expenses()
+            self.update_dashboard()
+        else:
+            messagebox.showerror("Error", "Failed to add expense.")
+    
     def clear_form(self):
         """Clear the add expense form"""
         self.amount_var.set("")
@@ -983,7 +1467,7 @@ class ExpenseTrackerApp:
         self.payment_method_var.set("Cash")
         
         # Reset to first category
-        categories = self.db_manager.get_categories()
+        categories = self._get_categories_cached()
         if categories:
             self.category_var.set(categories[0][1])
     
@@ -1022,14 +1506,20 @@ class ExpenseTrackerApp:
         )
         
         if confirm:
-            success = self.db_manager.delete_expense(expense_id)
-            
-            if success:
-                messagebox.showinfo("Success", "Expense deleted successfully.")
-                self.load_expenses()
-                self.update_dashboard()
-            else:
-                messagebox.showerror("Error", "Failed to delete expense.")
+            self.run_in_background(
+                lambda: self.db_manager.delete_expense(expense_id),
+                self.on_expense_deleted
+            )
+    
+    def on_expense_deleted(self, success):
+        """Report the result of deleting an expense and refresh the views"""
+        if success:
+            messagebox.showinfo("Success", "Expense deleted successfully.")
+            self._data_changed()
+            self.schedule_load_expenses()
+            self.update_dashboard()
+        else:
+            messagebox.showerror("Error", "Failed to delete expense.")
     
     def export_expenses(self):
         """Export expenses to CSV"""
@@ -1047,24 +1537,14 @@ class ExpenseTrackerApp:
                 filename += '.csv'
             
             # Get expenses based on current filters
-            start_date = self.expense_start_date_var.get() if self.expense_start_date_var.get() else None
-            end_date = self.expense_end_date_var.get() if self.expense_end_date_var.get() else None
+            start_date, end_date, category_id = self.get_expense_filters()
             
-            # Get selected category ID
-            category_id = None
-            if self.expense_category_var.get():
-                categories = self.db_manager.get_categories()
-                category_id_map = {cat[1]: cat[0] for cat in categories}
-                if self.expense_category_var.get() in category_id_map:
-                    category_id = category_id_map[self.expense_category_var.get()]
-            
-            expenses = self.db_manager.get_expenses(start_date, end_date, category_id)
-            
-            # Write to CSV
-            with open(filename, 'w', newline='') as csvfile:
+            # Stream rows from the cursor into the CSV writer; the large buffer keeps
+            # syscalls few and only one row is held in memory at a time
+            with open(filename, 'w', newline='', buffering=1 << 20) as csvfile:
                 csvwriter = csv.writer(csvfile)
                 csvwriter.writerow(['ID', 'Amount', 'Description', 'Category', 'Date', 'Payment Method'])
-                csvwriter.writerows(expenses)
+                csvwriter.writerows(self.db_manager.iter_expenses(start_date, end_date, category_id))
             
             messagebox.showinfo("Export Successful", f"Expenses exported to {filename}")
         
@@ -1087,21 +1567,27 @@ class ExpenseTrackerApp:
                 messagebox.showerror("Invalid Budget", "Budget cannot be negative.")
                 return
             
-            success = self.db_manager.update_category_budget(category_id, new_budget)
-            
-            if success:
-                messagebox.showinfo("Success", "Budget updated successfully.")
-                self.load_categories()
-                self.update_dashboard()
-                self.new_budget_var.set("")
-            else:
-                messagebox.showerror("Error", "Failed to update budget.")
+            self.run_in_background(
+                lambda: self.db_manager.update_category_budget(category_id, new_budget),
+                self.on_budget_updated
+            )
         
         except ValueError:
             messagebox.showerror("Invalid Input", "Please enter a valid budget amount.")
         except Exception as e:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
     
+    def on_budget_updated(self, success):
+        """Report the result of a budget update and refresh the views"""
+        if success:
+            messagebox.showinfo("Success", "Budget updated successfully.")
+            self._data_changed()
+            self.load_categories()
+            self.update_dashboard()
+            self.new_budget_var.set("")
+        else:
+            messagebox.showerror("Error", "Failed to update budget.")
+    
     def add_category(self):
         """Add a new expense category"""
         try:
@@ -1121,6 +1607,7 @@ class ExpenseTrackerApp:
             
             if success:
                 messagebox.showinfo("Success", "Category added successfully.")
+                self._data_changed()
                 self.load_categories()
                 self.new_category_var.set("")
                 self.initial_budget_var.set("0")
@@ -1134,13 +1621,13 @@ class ExpenseTrackerApp:
 
 def main():
     """Run the expense tracker application"""
-    import csv
-    
     root = tk.Tk()
     app = ExpenseTrackerApp(root)
     root.mainloop()
     
     # Close database connection when app closes
+    app._gateway_pool.shutdown()
+    app._io_pool.shutdown()
     app.db_manager.close()
 
 if __name__ == "__main__":